@@ -57,7 +57,7 @@ END = '\033[0m'
 # FOR DEVELOPER REFERENCE - helpful matplotlib stuff
 # mpl.colors, mpl.patches, mpl.Line2D, mpl.colors.ListedColormap, mpl.collections.LineCollection, mpl.cm, mpl.colors.Normalize
 
-def plot_histogram(data,bins='sqrt',comp_distribution=None,ax=None,labels=None,ks_alpha=0.05):
+def plot_histogram(data,bins='sqrt',comp_distribution=None,ax=None,labels=None,ks_alpha=0.05,kde=False,kde_bandwidth='silverman'):
     """
     Function to generate a nice histogram of n sets of 
     data. Can be used to compare multiple datasets or to
@@ -89,6 +89,14 @@ def plot_histogram(data,bins='sqrt',comp_distribution=None,ax=None,labels=None,k
         significance level to use for the Kolmogorov-Smirnov test
         if a comparative distribution is supplied
 
+    kde : bool
+        overlay a kernel density estimate of each input
+        dataset, scaled to the histogram counts
+
+    kde_bandwidth : string or float
+        rule used to calculate the kernel bandwidth
+        (silverman, scott or isj) or the bandwidth itself
+
     Returns
     -------
     """
@@ -113,6 +121,10 @@ def plot_histogram(data,bins='sqrt',comp_distribution=None,ax=None,labels=None,k
     nbins = sc.histogram_bins(len(max(distributions, key=len)),bins)
     #print(nbins)
 
+    # keep track of the input datasets before any comparison is appended
+    n_obs = len(distributions)
+    obs_labels = list(labels)
+
     if comp_distribution:
         # take samples from the equivalent theoretical distribution
         theor_dist, _ = sc.get_theoretical_dist(distributions[0],comp_distribution)
@@ -136,7 +148,7 @@ def plot_histogram(data,bins='sqrt',comp_distribution=None,ax=None,labels=None,k
                 print(f'Kolmogorov-Smirnov Test finds distribution to be {RED}statistically different{END} to a {comp_distribution} distribution at a {ks_alpha} signifcance level')
             
             # get maximum of both distributions
-            ypos = max(*distributions)
+            ypos = max(np.nanmax(dist) for dist in distributions)
             xpos = nbins
             ax.text(xpos,ypos,f'K-S Test Statistic: {round(ks_stat,3)}\nP-Value: {print_pval}')
         
@@ -150,7 +162,19 @@ def plot_histogram(data,bins='sqrt',comp_distribution=None,ax=None,labels=None,k
         ax.set_title('Histogram of Input Data',loc='left')
 
     # format axes
-    ax.hist(distributions,int(nbins),label=labels)
+    _, edges, patches = ax.hist(distributions,int(nbins),label=labels)
+
+    if kde:
+        # estimate all input densities in one batched call
+        grid, densities = sc.fft_kde(distributions[:n_obs],bandwidth=kde_bandwidth)
+        # hist only returns a list of containers for multiple datasets
+        containers = patches if len(distributions) > 1 else [patches]
+        for ii, (density, dist_obs) in enumerate(zip(densities,distributions[:n_obs])):
+            # scale the density to counts so it sits on the histogram
+            counts = density * np.isfinite(dist_obs).sum() * (edges[1] - edges[0])
+            lab = f'{obs_labels[ii]} KDE' if ii < len(obs_labels) else 'KDE'
+            ax.plot(grid,counts,color=containers[ii][0].get_facecolor(),alpha=1,label=lab)
+
     ax.legend()
     ax.set_title(f'{int(nbins)} Bins',loc='right')
 
@@ -8,6 +8,7 @@ Created: 28/06/2024
 Module performs statistics calculations for the 
 geometrics package which are called in geometrics.py
 """
+import numbers
 import warnings
 import numpy as np
 import scipy
@@ -213,3 +214,214 @@ def find_best_fit(data,distributions=common_distributions,gen_samples=False,alph
         return samples, dist_results
     else:
         return dist_results
+
+
+def kde_bandwidth(data,method='silverman',isj_gridsize=2**14):
+    """
+    Function calculates the bandwidth of a gaussian kernel
+    density estimate for a set of standard rules.
+
+    The valid rules are silverman's rule of thumb, scott's rule
+    and the improved sheather-jones (ISJ) algorithm of Botev et al. (2010).
+    The rules of thumb assume the data are roughly normal, whereas ISJ
+    makes no such assumption and so is better suited to multimodal data.
+
+    Parameters
+    ----------
+    data : arrayLike
+        array containing the data to estimate the bandwidth for
+    method : str or float
+        string determining the rule to use.
+        Valid strings are: 'silverman', 'scott', 'isj'.
+        If a number is passed it is assumed to be the bandwidth.
+    isj_gridsize : int
+        number of histogram bins used by the ISJ algorithm.
+        Ignored by the other rules.
+
+    Returns
+    -------
+    bandwidth : float
+        standard deviation of the gaussian kernel
+    """
+    data = np.asarray(data,dtype=float)
+    data = data[np.isfinite(data)]
+    n = len(data)
+
+    if isinstance(method,numbers.Real) and not isinstance(method,bool):
+        bandwidth = float(method)
+    elif n < 2:
+        raise(ValueError(f'at least two finite data points are needed to estimate a bandwidth, got {n}'))
+    elif method == 'silverman':
+        iqr = np.subtract(*np.percentile(data,[75,25]))
+        spread = min(np.std(data,ddof=1),iqr/1.349) if iqr > 0 else np.std(data,ddof=1)
+        bandwidth = 0.9 * spread * n**(-1.0/5.0)
+    elif method == 'scott':
+        bandwidth = 1.059 * np.std(data,ddof=1) * n**(-1.0/5.0)
+    elif method == 'isj':
+        bandwidth = _isj_bandwidth(data,gridsize=isj_gridsize)
+    else:
+        raise(TypeError(f'Invalid method: {method}. Select from silverman, scott or isj only.'))
+
+    if not (np.isfinite(bandwidth) and bandwidth > 0):
+        raise(ValueError(f'bandwidth must be positive and finite, got {bandwidth}. Check the spread of your data!'))
+    return bandwidth
+
+
+def _isj_fixed_point(t,N,I_sq,a2):
+    """
+    Fixed point equation t = xi * gamma^[l](t) solved in the
+    improved sheather-jones algorithm (Botev et al. 2010, eq. 30).
+    Returns the residual so that it can be passed to a root finder.
+    """
+    ell = 7
+    f = 2 * np.pi**(2*ell) * np.sum(I_sq**ell * a2 * np.exp(-I_sq * np.pi**2 * t))
+    if f <= 0:
+        return -1.0
+
+    # step down through the functionals of the density derivatives
+    for s in reversed(range(2,ell)):
+        K0 = np.prod(np.arange(1,2*s,2,dtype=float)) / np.sqrt(2*np.pi)
+        const = (1 + (1/2)**(s + 1/2)) / 3
+        time = (2 * const * K0 / (N * f))**(2.0 / (3.0 + 2.0*s))
+        f = 2 * np.pi**(2*s) * np.sum(I_sq**s * a2 * np.exp(-I_sq * np.pi**2 * time))
+
+    t_opt = (2 * N * np.sqrt(np.pi) * f)**(-2.0/5.0)
+    return t - t_opt
+
+
+def _isj_bandwidth(data,gridsize=2**14):
+    """
+    Function estimates the bandwidth using the improved
+    sheather-jones algorithm. The data are binned onto a grid
+    rescaled to [0,1] and the density functionals are evaluated
+    in the discrete cosine basis, which is the diffusion solution.
+
+    Parameters
+    ----------
+    data : arrayLike
+        array of finite data values
+    gridsize : int
+        number of grid points used to bin the data
+
+    Returns
+    -------
+    bandwidth : float
+        standard deviation of the gaussian kernel
+    """
+    # pad the data range by 10% either side, as in Botev et al. (2010)
+    dmin, dmax = data.min(), data.max()
+    pad = (dmax - dmin) / 10.0
+    xmin, xmax = dmin - pad, dmax + pad
+    R = xmax - xmin
+    N = len(np.unique(data))
+
+    # bin the data and move to the cosine basis
+    counts, _ = np.histogram(data,bins=gridsize,range=(xmin,xmax))
+    a = scipy.fft.dct(counts / len(data),type=2)
+    I_sq = np.arange(1,gridsize,dtype=float)**2
+    a2 = (a[1:] / 2)**2
+
+    # widen the search interval until the fixed point is bracketed
+    for tol in (0.1,0.2,0.4,0.8):
+        try:
+            t_star = scipy.optimize.brentq(_isj_fixed_point,0,tol,args=(N,I_sq,a2))
+            break
+        except ValueError:
+            continue
+    else:
+        raise(ValueError('improved sheather-jones failed to converge. Try the silverman or scott rule instead!'))
+
+    return np.sqrt(t_star) * R
+
+
+def fft_kde(data,bandwidth='silverman',gridsize=2**10,cut=3.0):
+    """
+    Function calculates a gaussian kernel density estimate
+    of n sets of data on a shared grid.
+
+    Each dataset is linearly binned onto the grid and then convolved
+    with the kernel using an FFT, so the cost is O(N + G log G) rather
+    than the O(N * G) of scipy.stats.gaussian_kde. All datasets are
+    convolved together in one batched transform.
+
+    Parameters
+    ----------
+    data : Any
+        Input data to function. Valid types are arrays,
+        lists of arrays or dictionaries containing labelled arrays.
+        A list of numbers is treated as a single dataset.
+    bandwidth : str or float
+        rule used to calculate the bandwidth of each dataset
+        (see kde_bandwidth) or the bandwidth itself. ISJ is
+        estimated on its own 2**14 bin grid, call kde_bandwidth
+        directly and pass the result to change this.
+    gridsize : int
+        number of points in the evaluation grid
+    cut : float
+        number of bandwidths to extend the grid past the
+        extremes of the data
+
+    Returns
+    -------
+    grid : arrayLike
+        points at which the density is evaluated
+    density : arrayLike or dict
+        density estimate for each dataset. Matches the input type,
+        with a list of arrays returning a 2D array (dataset, grid)
+    """
+    # check data type, a flat array or list of numbers is a single dataset
+    single = isinstance(data,np.ndarray) or \
+             (isinstance(data,(list,tuple)) and all(np.ndim(dist) == 0 for dist in data))
+    if isinstance(data,dict):
+        labels,distributions = list(data.keys()),list(data.values())
+    elif single:
+        labels,distributions = [0],[np.asarray(data)]
+    elif isinstance(data,(list,tuple)):
+        labels,distributions = list(range(len(data))),list(data)
+    else:
+        raise(TypeError(f'invalid datatype {type(data)}. Ensure type is an array, list or dictionary of arrays'))
+
+    # drop missing values so they do not poison the grid
+    distributions = [np.asarray(dist,dtype=float) for dist in distributions]
+    distributions = [dist[np.isfinite(dist)] for dist in distributions]
+    for lab, dist in zip(labels,distributions):
+        if len(dist) == 0:
+            raise(ValueError(f'dataset {lab} has no finite values. Check your input!'))
+    bandwidths = np.array([kde_bandwidth(dist,bandwidth) for dist in distributions])
+
+    # shared grid covering every dataset plus the kernel tails
+    lo = min(dist.min() for dist in distributions) - cut * bandwidths.max()
+    hi = max(dist.max() for dist in distributions) + cut * bandwidths.max()
+    grid, delta = np.linspace(lo,hi,gridsize,retstep=True)
+
+    # a kernel narrower than the grid spacing collapses to a spike
+    if bandwidths.min() < delta:
+        narrow = labels[np.argmin(bandwidths)]
+        warnings.warn(f'bandwidth of dataset {narrow} ({bandwidths.min():.3g}) is smaller than the grid spacing ({delta:.3g}) so its density is poorly resolved. Increase gridsize or estimate it separately!')
+
+    # linear binning: split each point between its two neighbouring grid points
+    binned = np.zeros((len(distributions),gridsize))
+    for row, dist in enumerate(distributions):
+        pos = (dist - lo) / delta
+        idx = np.clip(np.floor(pos).astype(int),0,gridsize-2)
+        frac = pos - idx
+        binned[row] = np.bincount(idx,weights=1-frac,minlength=gridsize) + \
+                      np.bincount(idx+1,weights=frac,minlength=gridsize)
+
+    # sample each kernel out to 4 bandwidths (or the full grid if narrower)
+    half = int(min(gridsize - 1,np.ceil(4 * bandwidths.max() / delta)))
+    offsets = np.arange(-half,half+1) * delta
+    kernels = np.exp(-0.5 * (offsets[None,:] / bandwidths[:,None])**2)
+    # normalise the sampled kernels so narrow bandwidths still integrate to 1 on a coarse grid
+    kernels /= kernels.sum(axis=1,keepdims=True) * delta
+
+    # convolve all datasets at once, zero padding to avoid wrap-around
+    nfft = scipy.fft.next_fast_len(gridsize + 2*half)
+    conv = scipy.fft.irfft(scipy.fft.rfft(binned,nfft,axis=1) * scipy.fft.rfft(kernels,nfft,axis=1),nfft,axis=1)
+    density = np.clip(conv[:,half:half+gridsize],0,None) / np.array([len(dist) for dist in distributions])[:,None]
+
+    if isinstance(data,dict):
+        return grid, dict(zip(labels,density))
+    elif single:
+        return grid, density[0]
+    return grid, density
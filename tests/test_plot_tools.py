@@ -0,0 +1,46 @@
+"""
+Tests for the kernel density overlay in plot_histogram
+"""
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pytest
+import matplotlib.pyplot as plt
+
+import geometrics.plot_tools as pt
+
+
+def _sample_data():
+    prng = np.random.default_rng(19680801)
+    return {'a': prng.normal(0,1,size=2000),
+            'b': prng.normal(3,2,size=1000)}
+
+
+@pytest.mark.parametrize('comp_distribution',[None,'normal'])
+def test_plot_histogram_kde_overlay(comp_distribution):
+    data = _sample_data()
+    fig, ax = plt.subplots(1,1)
+    pt.plot_histogram(data,comp_distribution=comp_distribution,ax=ax,kde=True)
+
+    # one curve per input dataset, none for the comparison distribution
+    lines = ax.get_lines()
+    assert [line.get_label() for line in lines] == ['a KDE','b KDE']
+
+    # area under each curve is the number of points times the bin width
+    bars = ax.containers[0]
+    binwidth = bars[1].get_x() - bars[0].get_x()
+    for line, dist in zip(lines,data.values()):
+        x, y = line.get_data()
+        area = y.sum() * (x[1] - x[0])
+        assert area == pytest.approx(np.isfinite(dist).sum() * binwidth,rel=1e-2)
+    plt.close(fig)
+
+
+def test_plot_histogram_kde_single_array():
+    data = _sample_data()['a']
+    fig, ax = plt.subplots(1,1)
+    pt.plot_histogram(data,ax=ax,kde=True)
+
+    assert [line.get_label() for line in ax.get_lines()] == ['KDE']
+    plt.close(fig)
@@ -0,0 +1,70 @@
+"""
+Tests for the kernel density estimation routines in stats_calcs.py
+"""
+import numpy as np
+import pytest
+import scipy
+
+import geometrics.stats_calcs as sc
+
+
+def test_fft_kde_matches_gaussian_kde():
+    prng = np.random.default_rng(19680801)
+    sample = prng.normal(size=500)
+    bandwidth = sc.kde_bandwidth(sample,'silverman')
+
+    grid, density = sc.fft_kde(sample,bandwidth=bandwidth)
+    # gaussian_kde scales a scalar bw_method by the sample standard deviation
+    reference = scipy.stats.gaussian_kde(sample,bw_method=bandwidth/np.std(sample,ddof=1))(grid)
+
+    np.testing.assert_allclose(density,reference,atol=1e-3)
+
+
+def test_fft_kde_integrates_to_one():
+    prng = np.random.default_rng(19680801)
+    data = {'a': prng.normal(0,1,size=10000),
+            'b': prng.normal(5,2,size=1000)}
+
+    grid, density = sc.fft_kde(data)
+    delta = grid[1] - grid[0]
+
+    for lab in data:
+        assert density[lab].sum() * delta == pytest.approx(1,rel=1e-2)
+
+
+def test_fft_kde_warns_narrow_bandwidth():
+    prng = np.random.default_rng(19680801)
+    data = {'narrow': prng.normal(0,0.01,size=1000),
+            'wide': prng.normal(0,100,size=1000)}
+
+    with pytest.warns(UserWarning,match='narrow'):
+        sc.fft_kde(data)
+
+
+def test_fft_kde_list_of_numbers():
+    grid, density = sc.fft_kde([1.,2.,3.,4.])
+    assert density.shape == grid.shape
+
+
+def test_fft_kde_empty_dataset():
+    data = {'good': np.arange(10.0),'missing': np.full(5,np.nan)}
+    with pytest.raises(ValueError,match='missing'):
+        sc.fft_kde(data,bandwidth=1.0)
+
+
+def test_kde_bandwidth_numeric():
+    sample = np.arange(10.0)
+    assert sc.kde_bandwidth(sample,np.float32(0.5)) == pytest.approx(0.5)
+    assert sc.kde_bandwidth(sample,np.int64(1)) == 1.0
+    with pytest.raises(TypeError):
+        sc.kde_bandwidth(sample,True)
+
+
+def test_isj_bandwidth_normal():
+    prng = np.random.default_rng(19680801)
+    n = 5000
+    sample = prng.normal(size=n)
+    # optimal bandwidth for normal data
+    optimum = 1.059 * np.std(sample,ddof=1) * n**(-1.0/5.0)
+
+    assert sc.kde_bandwidth(sample,'isj') == pytest.approx(optimum,rel=0.15)